@@ -5,37 +5,82 @@
 """CLI tool for interacting with Rigol DP832A power supply."""
 
 import argparse
-import configparser
+import contextlib
+import functools
 import os
-import subprocess
+import signal
 import sys
 from pathlib import Path
+
 from dp800lib import DP800Controller, DP800Error
 
+# Terminal environment used by supports_color(), captured once at startup
+_STDOUT_ISATTY = sys.stdout.isatty()
+_NO_COLOR = bool(os.environ.get('NO_COLOR'))
+_TERM = os.environ.get('TERM', '')
+
+
+def connect_daemon(args, validate):
+    """Connect to a running daemon serving the device selected on the command line.
+
+    The daemon is only used if it runs with the same --timeout-ms, and, when
+    validate is True, checked the device ID itself.
+
+    Returns:
+        DaemonClient: Connected client, or None if no suitable daemon is running
+    """
+    from dp800daemon import DAEMON_SUPPORTED, DaemonClient  # pylint: disable=import-outside-toplevel
+
+    if not DAEMON_SUPPORTED:
+        return None
+
+    client = DaemonClient()
+    try:
+        client.connect()
+        if client.serves(args.ip, args.port, args.timeout_ms, validate):
+            return client
+    except (OSError, DP800Error):
+        pass
+
+    client.disconnect()
+    return None
+
+
+@contextlib.contextmanager
+def connected_controller(args, validate=True, use_daemon=True):
+    """Connect to the device selected by the command line arguments.
+
+    The device ID is checked unless validate is False or --skip-id-check was
+    given. If a daemon started with the 'daemon' subcommand is serving the device
+    with the same settings, calls go through it and the connection it already
+    holds; it checked the device ID when it started. Otherwise a direct connection
+    is opened. Either way the connection is closed when the block exits.
+    """
+    validate = validate and not args.skip_id_check
+    controller = connect_daemon(args, validate) if use_daemon else None
+    try:
+        if controller is None:
+            controller = DP800Controller(args.ip, args.port, timeout_ms=args.timeout_ms)
+            controller.connect()
+            if validate:
+                controller.validate_device_id(controller.get_device_id())
+        yield controller
+    finally:
+        if controller is not None:
+            controller.disconnect()
+
 
 def cmd_id(args):
     """Handle the 'id' subcommand."""
-    try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
+    with connected_controller(args, validate=False) as controller:
         device_id = controller.get_device_id()
         controller.validate_device_id(device_id)
         print(f"Device ID: {device_id}")
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
 
 
 def cmd_state(args):
     """Handle the 'state' subcommand."""
-    try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
-        controller.validate_device_id(controller.get_device_id())
-
+    with connected_controller(args) as controller:
         if args.channel:
             # Query specific channel
             state = controller.get_channel_state(args.channel)
@@ -47,119 +92,93 @@ def cmd_state(args):
                 print_channel_state(state)
                 print()  # Empty line between channels
 
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
-
 
 def cmd_screenshot(args):
     """Handle the 'screenshot' subcommand."""
-    try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
-        controller.validate_device_id(controller.get_device_id())
+    # Only needed for launching the viewer
+    import shlex  # pylint: disable=import-outside-toplevel
+    import subprocess  # pylint: disable=import-outside-toplevel
 
+    with connected_controller(args) as controller:
         filename = controller.take_screenshot(args.output)
-        print(f"Screenshot saved to: {filename}")
-
-        # Check if screenshot viewer is configured
-        config_values = load_config()
-        viewer_cmd = config_values.get('screenshotviewer', '').strip()
-
-        if viewer_cmd:
-            # Replace {filename} placeholder with actual filename
-            viewer_cmd_final = viewer_cmd.format(filename=filename)
-
-            # Check if debug mode is enabled for screenshot viewer
-            screenshot_debug = is_color_enabled(config_values.get('screenshotdebug', 'false'))
-
-            try:
-                # Run the viewer command in background
-                if screenshot_debug:
-                    # Debug mode: show viewer output
-                    subprocess.Popen(viewer_cmd_final, shell=True)  # pylint: disable=consider-using-with
-                else:
-                    # Normal mode: suppress viewer output
-                    subprocess.Popen(  # pylint: disable=consider-using-with
-                        viewer_cmd_final,
-                        shell=True,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL
-                    )
-                print(f"Opening screenshot with: {viewer_cmd_final}")
-            except (subprocess.SubprocessError, OSError) as error_msg:
-                print(f"Warning: Failed to open screenshot viewer: {error_msg}", file=sys.stderr)
+    print(f"Screenshot saved to: {filename}")
 
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
+    # Check if screenshot viewer is configured
+    config_values = load_config()
+    viewer_cmd = config_values.get('screenshotviewer', '').strip()
+
+    if viewer_cmd:
+        # Check if debug mode is enabled for screenshot viewer
+        screenshot_debug = _parse_bool(config_values.get('screenshotdebug'), default=False)
+
+        try:
+            # Split the command ourselves instead of going through a shell, and
+            # replace the {filename} placeholder in each argument so filenames
+            # containing spaces stay a single argument
+            viewer_argv = [
+                arg.format(filename=filename)
+                for arg in shlex.split(viewer_cmd, comments=True)
+            ]
+
+            # Run the viewer command in background
+            if screenshot_debug:
+                # Debug mode: show viewer output
+                subprocess.Popen(  # pylint: disable=consider-using-with
+                    viewer_argv,
+                    start_new_session=True,
+                    stdin=subprocess.DEVNULL
+                )
+            else:
+                # Normal mode: suppress viewer output
+                subprocess.Popen(  # pylint: disable=consider-using-with
+                    viewer_argv,
+                    start_new_session=True,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            print(f"Opening screenshot with: {shlex.join(viewer_argv)}")
+        except (subprocess.SubprocessError, OSError, ValueError) as error_msg:
+            print(f"Warning: Failed to open screenshot viewer: {error_msg}", file=sys.stderr)
 
 
 def cmd_on(args):
     """Handle the 'on' subcommand."""
     try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
-        controller.validate_device_id(controller.get_device_id())
+        channel = None if args.channel == 'all' else int(args.channel)
+    except ValueError:
+        print(f"Error: Invalid channel '{args.channel}'. Must be 1-3 or 'all'.", file=sys.stderr)
+        sys.exit(1)
 
-        if args.channel == 'all':
+    with connected_controller(args) as controller:
+        if channel is None:
             controller.set_all_outputs_state(True)
             print("All channels turned ON")
         else:
-            channel = int(args.channel)
             controller.set_output_state(channel, True)
             print(f"Channel {channel} turned ON")
 
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    except ValueError:
-        print(f"Error: Invalid channel '{args.channel}'. Must be 1-3 or 'all'.", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
-
 
 def cmd_off(args):
     """Handle the 'off' subcommand."""
     try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
-        controller.validate_device_id(controller.get_device_id())
+        channel = None if args.channel == 'all' else int(args.channel)
+    except ValueError:
+        print(f"Error: Invalid channel '{args.channel}'. Must be 1-3 or 'all'.", file=sys.stderr)
+        sys.exit(1)
 
-        if args.channel == 'all':
+    with connected_controller(args) as controller:
+        if channel is None:
             controller.set_all_outputs_state(False)
             print("All channels turned OFF")
         else:
-            channel = int(args.channel)
             controller.set_output_state(channel, False)
             print(f"Channel {channel} turned OFF")
 
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    except ValueError:
-        print(f"Error: Invalid channel '{args.channel}'. Must be 1-3 or 'all'.", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
-
 
 def cmd_set(args):
     """Handle the 'set' subcommand."""
-    try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
-        controller.validate_device_id(controller.get_device_id())
-
+    with connected_controller(args) as controller:
         # If no voltage or current specified, show current parameters
         if args.voltage is None and args.current is None:
             parameters = controller.get_channel_parameters(args.channel)
@@ -177,54 +196,95 @@ def cmd_set(args):
 
             print(f"Channel {args.channel}: Set {' and '.join(set_items)}")
 
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
-
 
 def cmd_preset(args):
     """Handle the 'preset' subcommand."""
-    try:
-        controller = DP800Controller(args.ip, args.port)
-        controller.connect()
-        controller.validate_device_id(controller.get_device_id())
-
+    with connected_controller(args) as controller:
         controller.apply_preset(args.value)
 
-        # Map preset values to user-friendly names
-        preset_names = {
-            0: 'DEFAULT',
-            1: 'USER1',
-            2: 'USER2',
-            3: 'USER3',
-            4: 'USER4'
-        }
+    # Map preset values to user-friendly names
+    preset_names = {
+        0: 'DEFAULT',
+        1: 'USER1',
+        2: 'USER2',
+        3: 'USER3',
+        4: 'USER4'
+    }
 
-        print(f"Applied preset {args.value} ({preset_names[args.value]})")
+    print(f"Applied preset {args.value} ({preset_names[args.value]})")
 
-    except DP800Error as error_msg:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    finally:
-        if 'controller' in locals():
-            controller.disconnect()
+
+def cmd_daemon(args):
+    """Handle the 'daemon' subcommand."""
+    import dp800daemon  # pylint: disable=import-outside-toplevel
+
+    if not dp800daemon.DAEMON_SUPPORTED:
+        raise DP800Error("The daemon needs UNIX domain sockets, which this platform lacks")
+
+    if args.stop:
+        client = dp800daemon.DaemonClient()
+        try:
+            client.connect()
+        except OSError:
+            print(f"Error: No daemon is listening on {client.socket_path}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            client.shutdown()
+        finally:
+            client.disconnect()
+        print("Daemon stopped")
+        return
+
+    with connected_controller(args, use_daemon=False) as controller:
+        server = dp800daemon.DaemonServer(controller, validate=not args.skip_id_check)
+        print(f"Daemon connected to {controller.resource_name}, "
+              f"listening on {server.socket_path}")
+
+        if not args.foreground:
+            # Detach from the terminal; the parent exits without disconnecting so
+            # the child keeps the device connection
+            sys.stdout.flush()
+            if os.fork():
+                os._exit(0)
+            os.setsid()
+            with open(os.devnull, 'r+b') as devnull:
+                for stream in (sys.stdin, sys.stdout, sys.stderr):
+                    os.dup2(devnull.fileno(), stream.fileno())
+
+        # Exit through the finally blocks, removing the socket and disconnecting
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        server.serve_until_stopped()
+
+
+def _parse_bool(config_value, default):
+    """Interpret a boolean configuration value.
+
+    Accepts the true spellings configparser does; any other value is false.
+
+    Args:
+        config_value (str): Value from the config file, or None if unset
+        default (bool): Result if the value is unset
+
+    Returns:
+        bool: The interpreted value
+    """
+    if config_value is None:
+        return default
+    return str(config_value).lower().strip() in ('1', 'yes', 'true', 'on')
 
 
 def is_color_enabled(config_color_value):
     """Check if color is enabled based on configuration value."""
-    if config_color_value is None:
-        return True  # Default to enabled
-
-    # Convert to lowercase string and check for true values
-    color_str = str(config_color_value).lower().strip()
-    return color_str in ['true', '1', 'on']
+    return _parse_bool(config_color_value, default=True)
 
 
+@functools.lru_cache(maxsize=1)
 def supports_color():
-    """Check if the terminal supports ANSI color codes and color is enabled."""
+    """Check if the terminal supports ANSI color codes and color is enabled.
+
+    The result is cached, since neither the terminal nor the configuration
+    changes during a single invocation.
+    """
     # Load config to check color setting
     config_values = load_config()
 
@@ -233,22 +293,22 @@ def supports_color():
         return False
 
     # Check if stdout is a TTY and TERM is set appropriately
-    if not sys.stdout.isatty():
+    if not _STDOUT_ISATTY:
         return False
 
     # Check for NO_COLOR environment variable
-    if os.environ.get('NO_COLOR'):
+    if _NO_COLOR:
         return False
 
     # Check TERM environment variable
-    term = os.environ.get('TERM', '')
-    return 'color' in term or term in ['xterm', 'xterm-256color', 'screen', 'tmux']
+    return 'color' in _TERM or _TERM in ['xterm', 'xterm-256color', 'screen', 'tmux']
 
 
-def get_channel_color(channel):
-    """Get ANSI color code for a channel."""
+@functools.lru_cache(maxsize=None)
+def get_channel_style(channel):
+    """Get ANSI codes for a channel as (color_start, color_end, bold_start, bold_end)."""
     if not supports_color():
-        return '', ''
+        return '', '', '', ''
 
     # ANSI color codes
     colors = {
@@ -258,39 +318,103 @@ def get_channel_color(channel):
     }
     reset = '\033[0m'   # Reset to default
 
-    return colors.get(channel, ''), reset
+    # Bold ANSI codes for highlighting output enabled status
+    bold_start = '\033[1m'
+    bold_end = '\033[22m'  # Turn off bold, preserve other formatting
+
+    return colors.get(channel, ''), reset, bold_start, bold_end
 
 
 def print_channel_state(state):
     """Print formatted channel state information with color coding."""
     channel = state['channel']
-    color_start, color_end = get_channel_color(channel)
-
-    # Bold ANSI codes for highlighting output enabled status
-    if supports_color():
-        bold_start = '\033[1m'
-        bold_end = '\033[22m'  # Turn off bold, preserve other formatting
-    else:
-        bold_start = bold_end = ''
-
-    print(f"{color_start}Channel {channel}:")
-    print(f"  Output Enabled:  {bold_start}{state['output_enabled']}{bold_end}")
-    print(f"  Set Voltage:     {state['set_voltage']:>8.3f} V")
-    print(f"  Set Current:     {state['set_current']:>8.3f} A")
-    print(f"  OVP Value:       {state['ovp_value']:>8.3f} V")
-    print(f"  OVP Enabled:     {state['ovp_enabled']}")
-    print(f"  OCP Value:       {state['ocp_value']:>8.3f} A")
-    print(f"  OCP Enabled:     {state['ocp_enabled']}{color_end}")
+    color_start, color_end, bold_start, bold_end = get_channel_style(channel)
+
+    # Print the whole block at once rather than line by line
+    print(
+        f"{color_start}Channel {channel}:\n"
+        f"  Output Enabled:  {bold_start}{state['output_enabled']}{bold_end}\n"
+        f"  Set Voltage:     {state['set_voltage']:>8.3f} V\n"
+        f"  Set Current:     {state['set_current']:>8.3f} A\n"
+        f"  OVP Value:       {state['ovp_value']:>8.3f} V\n"
+        f"  OVP Enabled:     {state['ovp_enabled']}\n"
+        f"  OCP Value:       {state['ocp_value']:>8.3f} A\n"
+        f"  OCP Enabled:     {state['ocp_enabled']}{color_end}"
+    )
 
 
+def parse_config_file(config_file):
+    """Parse a configuration file in INI format.
+
+    Follows configparser's default syntax: [section] headers, 'key = value' or
+    'key: value' options, values continued on more deeply indented lines, and
+    whole-line comments starting with '#' or ';'. Blank lines are skipped, also
+    within continued values. Options in a [DEFAULT] section
+    apply to every other section that doesn't set them. Option names are
+    case-insensitive and returned in lowercase.
+
+    Args:
+        config_file (iterable): Lines of the configuration file
+
+    Returns:
+        dict: Options of each section except DEFAULT, keyed by section name
+
+    Raises:
+        ValueError: If a line is neither a section header, an option, a
+            continuation nor a comment, or a section or option is repeated
+    """
+    sections = {}
+    section = None
+    option = None
+    option_indent = 0
+
+    for line in config_file:
+        stripped = line.strip()
+        if not stripped or stripped[0] in '#;':
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        if option is not None and indent > option_indent:
+            sections[section][option] += '\n' + stripped
+            continue
+        option = None
+
+        if stripped[0] == '[' and stripped[-1] == ']':
+            section = stripped[1:-1].strip()
+            if section in sections:
+                raise ValueError(f"Duplicate section [{section}]")
+            sections[section] = {}
+            continue
+
+        # Options are split at the first '=' or ':'
+        separators = [stripped.find(separator) for separator in '=:' if separator in stripped]
+        if section is None or not separators:
+            raise ValueError(f"Invalid configuration line: {stripped}")
+
+        split_at = min(separators)
+        option = stripped[:split_at].strip().lower()
+        if option in sections[section]:
+            raise ValueError(f"Duplicate option '{option}' in section [{section}]")
+        sections[section][option] = stripped[split_at + 1:].strip()
+        option_indent = indent
+
+    defaults = sections.pop('DEFAULT', {})
+    return {name: {**defaults, **options} for name, options in sections.items()}
+
+
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from .dp800config files."""
-    config = configparser.ConfigParser()
+    """Load configuration from .dp800config files.
+
+    The result is cached, so the files are read and parsed only once per process.
+    """
+    sections = {}
 
     # Default values
     defaults = {
         'ip': '192.168.0.55',
         'port': '5555',
+        'validate': 'true',
         'color': 'true',
         'screenshotviewer': '',
         'screenshotdebug': 'false'
@@ -303,33 +427,26 @@ def load_config():
     ]
 
     for config_path in config_paths:
-        if config_path.exists():
-            try:
-                config.read(config_path)
-                break
-            except configparser.Error:
-                # If config file is malformed, continue to next location
-                continue
+        # Just try to open each location; a missing file is the common case
+        try:
+            with open(config_path, encoding='utf-8') as config_file:
+                sections = parse_config_file(config_file)
+            break
+        except OSError:
+            continue
+        except ValueError:
+            # If config file is malformed, continue to next location
+            continue
 
     # Get values from config, falling back to defaults
-    if config.has_section('device'):
-        device_section = dict(config['device'])
-    else:
-        device_section = {}
-
-    if config.has_section('display'):
-        display_section = dict(config['display'])
-    else:
-        display_section = {}
-
-    if config.has_section('tools'):
-        tools_section = dict(config['tools'])
-    else:
-        tools_section = {}
+    device_section = sections.get('device', {})
+    display_section = sections.get('display', {})
+    tools_section = sections.get('tools', {})
 
     return {
         'ip': device_section.get('ip', defaults['ip']),
         'port': int(device_section.get('port', defaults['port'])),
+        'validate': device_section.get('validate', defaults['validate']),
         'color': display_section.get('color', defaults['color']),
         'screenshotviewer': tools_section.get('screenshotviewer', defaults['screenshotviewer']),
         'screenshotdebug': tools_section.get('screenshotdebug', defaults['screenshotdebug'])
@@ -357,6 +474,26 @@ def main():
         default=config_values['port'],
         help=f'Port number for SCPI communication (default: {config_values["port"]})'
     )
+    parser.add_argument(
+        '--timeout-ms',
+        type=int,
+        default=DP800Controller.DEFAULT_TIMEOUT_MS,
+        help='Timeout in milliseconds for connecting and each device operation '
+             f'(default: {DP800Controller.DEFAULT_TIMEOUT_MS})'
+    )
+    id_check_group = parser.add_mutually_exclusive_group()
+    id_check_group.add_argument(
+        '--skip-id-check',
+        action='store_true',
+        help='Skip the *IDN? device model check before each command'
+    )
+    id_check_group.add_argument(
+        '--id-check',
+        dest='skip_id_check',
+        action='store_false',
+        help='Check the device model even if the config file sets validate = false'
+    )
+    parser.set_defaults(skip_id_check=not _parse_bool(config_values['validate'], default=True))
 
     # Subcommands
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
@@ -431,6 +568,22 @@ def main():
     )
     preset_parser.set_defaults(func=cmd_preset)
 
+    # Daemon command
+    daemon_parser = subparsers.add_parser(
+        'daemon', help='Keep the device connection open in the background for other commands'
+    )
+    daemon_parser.add_argument(
+        '-f', '--foreground',
+        action='store_true',
+        help='Stay in the foreground instead of detaching'
+    )
+    daemon_parser.add_argument(
+        '--stop',
+        action='store_true',
+        help='Stop the running daemon'
+    )
+    daemon_parser.set_defaults(func=cmd_daemon)
+
     # Parse arguments
     args = parser.parse_args()
 
@@ -439,7 +592,11 @@ def main():
         sys.exit(1)
 
     # Execute the command
-    args.func(args)
+    try:
+        args.func(args)
+    except DP800Error as error_msg:
+        print(f"Error: {error_msg}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
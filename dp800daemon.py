@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Steve deRosier
+
+"""Daemon that keeps a DP832A connection open between CLI invocations.
+
+The daemon owns a connected DP800Controller and serves requests over a UNIX
+domain socket, one JSON object per line:
+
+    request:  {"method": "get_channel_state", "args": [1], "cwd": "/home/user"}
+    response: {"result": {...}} or {"error": "message"}
+
+Requests are handled one at a time, so access to the device stays serialized.
+After a failed exchange with the device, the daemon reconnects to it and, if it
+checked the device ID at startup, checks it again.
+
+The daemon needs UNIX domain sockets; where they are missing, DAEMON_SUPPORTED
+is False and DaemonServer is not defined.
+"""
+
+import json
+import os
+import socket
+import socketserver
+from pathlib import Path
+
+from dp800lib import DP800Error
+
+DEFAULT_SOCKET_PATH = Path.home() / '.dp800.sock'
+
+# Controller methods that clients may call through the daemon
+DAEMON_METHODS = frozenset({
+    'get_device_id',
+    'validate_device_id',
+    'get_channel_state',
+    'get_all_channels_state',
+    'take_screenshot',
+    'set_output_state',
+    'set_all_outputs_state',
+    'get_output_state',
+    'set_channel_parameters',
+    'set_channel_parameters_batch',
+    'get_channel_parameters',
+    'apply_preset',
+})
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle the requests of one client connection."""
+
+    def handle(self):
+        """Answer requests until the client closes the connection."""
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {'result': self.server.dispatch(request)}
+            except (DP800Error, TypeError, ValueError, KeyError, OSError) as error_msg:
+                response = {'error': str(error_msg)}
+
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+# The server needs UNIX domain sockets, which some platforms, such as Windows,
+# don't provide
+DAEMON_SUPPORTED = hasattr(socket, 'AF_UNIX')
+
+
+if DAEMON_SUPPORTED:
+    class DaemonServer(socketserver.UnixStreamServer):
+        """UNIX socket server dispatching requests to a connected controller."""
+
+        def __init__(self, controller, socket_path=DEFAULT_SOCKET_PATH, validate=True):
+            """Bind the daemon socket for a connected controller.
+
+            Args:
+                controller (DP800Controller): Connected controller to serve
+                socket_path (Path): Path of the UNIX socket to listen on
+                validate (bool): Whether the device ID was checked, and is checked
+                    again after reconnecting
+
+            Raises:
+                DP800Error: If another daemon is already listening on socket_path
+            """
+            self.controller = controller
+            self.socket_path = Path(socket_path)
+            self.validate = validate
+            self.stop_requested = False
+
+            if self.socket_path.exists():
+                if DaemonClient(self.socket_path).ping():
+                    raise DP800Error(f"A daemon is already listening on {self.socket_path}")
+                self.socket_path.unlink()  # Left behind by a daemon that did not exit cleanly
+
+            # Keep the socket private to the current user
+            old_umask = os.umask(0o077)
+            try:
+                super().__init__(str(self.socket_path), _RequestHandler)
+            finally:
+                os.umask(old_umask)
+
+        def dispatch(self, request):
+            """Run a single request against the controller.
+
+            Args:
+                request (dict): Decoded request with 'method', 'args' and 'cwd'
+
+            Returns:
+                The result of the controller method, which must be JSON serializable
+
+            Raises:
+                DP800Error: If the method is unknown or the controller call fails
+            """
+            method = request['method']
+
+            if method == 'device':
+                return {
+                    'ip_address': self.controller.ip_address,
+                    'port': self.controller.port,
+                    'timeout_ms': self.controller.timeout_ms,
+                    'validate': self.validate,
+                }
+
+            if method == 'shutdown':
+                self.stop_requested = True
+                return None
+
+            if method not in DAEMON_METHODS:
+                raise DP800Error(f"Unsupported daemon request '{method}'")
+
+            # Resolve relative paths, such as screenshot filenames, like the client would
+            os.chdir(request.get('cwd') or '/')
+            try:
+                return getattr(self.controller, method)(*request.get('args', []))
+            except DP800Error as error_msg:
+                # Errors wrapping another exception come from failed I/O, which may
+                # have left the device connection out of step
+                if error_msg.__cause__ is not None:
+                    self.reconnect()
+                raise
+
+        def reconnect(self):
+            """Reopen the device connection after a failed exchange with the device.
+
+            A failed exchange can leave replies unread, which later requests would
+            then take for their own. If the device can't be reached again, or no
+            longer passes the device ID check, the daemon stops, and clients fall
+            back to connecting directly.
+            """
+            self.controller.disconnect()
+            try:
+                self.controller.connect()
+                if self.validate:
+                    self.controller.validate_device_id(self.controller.get_device_id())
+            except DP800Error:
+                self.stop_requested = True
+
+        def serve_until_stopped(self):
+            """Handle requests until a client asks the daemon to shut down."""
+            try:
+                while not self.stop_requested:
+                    self.handle_request()
+            finally:
+                self.server_close()
+                self.socket_path.unlink(missing_ok=True)
+
+
+class DaemonClient:
+    """Controller stand-in that forwards calls to a running daemon.
+
+    Supports the controller methods listed in DAEMON_METHODS, plus connect()
+    and disconnect() for the connection to the daemon itself.
+    """
+
+    # Socket timeouts in seconds. Daemon requests answered without the device
+    # should be instant, so a daemon that is stuck or busy with another client is
+    # given up on quickly; device requests get enough time for a screenshot.
+    PROBE_TIMEOUT = 2.0
+    REQUEST_TIMEOUT = 60.0
+    _PROBE_METHODS = frozenset({'device', 'shutdown'})
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        """Initialize the client.
+
+        Args:
+            socket_path (Path): Path of the daemon's UNIX socket
+        """
+        self.socket_path = Path(socket_path)
+        self.sock = None
+        self.stream = None
+
+    def connect(self):
+        """Connect to the daemon.
+
+        Raises:
+            OSError: If no daemon is listening on the socket
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.PROBE_TIMEOUT)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+        self.stream = sock.makefile('rwb')
+
+    def disconnect(self):
+        """Close the connection to the daemon."""
+        if self.stream:
+            self.stream.close()
+            self.sock.close()
+            self.stream = None
+            self.sock = None
+
+    def ping(self):
+        """Check whether a daemon is listening on the socket.
+
+        Returns:
+            bool: True if a daemon answered
+        """
+        try:
+            self.connect()
+            self.call('device')
+            return True
+        except (OSError, DP800Error):
+            return False
+        finally:
+            self.disconnect()
+
+    def call(self, method, *args):
+        """Run a request on the daemon and return its result.
+
+        Args:
+            method (str): Controller method name or daemon request
+            *args: Positional arguments for the method
+
+        Returns:
+            The result returned by the daemon
+
+        Raises:
+            DP800Error: If the daemon reports an error or the connection fails
+        """
+        if not self.stream:
+            raise DP800Error("Daemon not connected. Call connect() first.")
+
+        request = {'method': method, 'args': args, 'cwd': os.getcwd()}
+        try:
+            self.sock.settimeout(
+                self.PROBE_TIMEOUT if method in self._PROBE_METHODS else self.REQUEST_TIMEOUT
+            )
+            self.stream.write(json.dumps(request).encode() + b'\n')
+            self.stream.flush()
+            response = json.loads(self.stream.readline())
+        except (OSError, ValueError) as error_msg:
+            raise DP800Error(f"Failed to communicate with daemon: {error_msg}") from error_msg
+
+        if 'error' in response:
+            raise DP800Error(response['error'])
+        return response.get('result')
+
+    def serves(self, ip_address, port, timeout_ms, validate):
+        """Check whether the daemon is connected to the given device as requested.
+
+        Args:
+            ip_address (str): IP address of the device
+            port (int): Port number for SCPI communication
+            timeout_ms (int): I/O timeout the caller wants, in milliseconds
+            validate (bool): Whether the caller wants the device ID checked
+
+        Returns:
+            bool: True if the daemon's controller uses this address, port and
+            timeout, and the daemon checked the device ID if the caller wants it
+        """
+        device = self.call('device')
+        return (
+            (device['ip_address'], device['port'], device['timeout_ms'])
+            == (ip_address, port, timeout_ms)
+            and (device['validate'] or not validate)
+        )
+
+    def shutdown(self):
+        """Ask the daemon to disconnect from the device and exit."""
+        self.call('shutdown')
+
+    def __getattr__(self, name):
+        """Forward supported controller methods to the daemon."""
+        if name in DAEMON_METHODS:
+            return lambda *args: self.call(name, *args)
+        raise AttributeError(name)
@@ -4,16 +4,360 @@
 
 """Library for SCPI communication with Rigol DP832A power supply."""
 
-import time
+import atexit
+import contextlib
+import functools
+import itertools
+import os
+import socket
 from datetime import datetime
 
-import pyvisa
+# Other fixed per-channel commands, looked up instead of formatted on every call
+_CHANNEL_COMMANDS = {
+    channel: {
+        'volt?': f':SOUR{channel}:VOLT?',
+        'curr?': f':SOUR{channel}:CURR?',
+        'outp?': f':OUTP? CH{channel}',
+        'outp on': f':OUTP CH{channel},ON',
+        'outp off': f':OUTP CH{channel},OFF',
+        'appl?': f':APPL? CH{channel}',
+    }
+    for channel in range(1, 4)
+}
+
+# Compound writes switching every output, keyed by the requested state
+_ALL_OUTPUTS_COMMAND = {
+    state: ';'.join(commands[key] for commands in _CHANNEL_COMMANDS.values())
+    for state, key in ((True, 'outp on'), (False, 'outp off'))
+}
+
+@functools.lru_cache(maxsize=1)
+def _get_resource_manager():
+    """Get the resource manager shared by all controllers.
+
+    Creating a resource manager loads and initializes the pyvisa-py backend, so it
+    is done once, on first use, and the manager is closed at exit. pyvisa itself is
+    only imported then, so the default socket transport doesn't pay for loading it.
+
+    Returns:
+        pyvisa.ResourceManager: The shared resource manager
+    """
+    import pyvisa  # pylint: disable=import-outside-toplevel
+
+    resource_manager = pyvisa.ResourceManager('@py')
+    atexit.register(resource_manager.close)
+    return resource_manager
+
+
+# Errors raised by either transport for failed device I/O, including replies
+# that are not ASCII text
+_IO_ERRORS = (OSError, UnicodeDecodeError)
+
+
+def _is_on(response):
+    """Check whether an ON/OFF status response reads ON.
+
+    The guide documents these responses as exactly ON or OFF; anything else means
+    the reply is out of step or garbled, so it is rejected rather than read as OFF.
+
+    Args:
+        response (str): Status response field
+
+    Returns:
+        bool: True for ON, False for OFF
+
+    Raises:
+        ValueError: If the response is neither ON nor OFF
+    """
+    response = response.strip()
+    if response not in ('ON', 'OFF'):
+        raise ValueError(f"unexpected ON/OFF response {response!r}")
+    return response == 'ON'
+
+
+class _SocketTransport:
+    """SCPI client talking directly to the device's raw TCP socket.
+
+    Provides the parts of the pyvisa message-based resource interface used by
+    DP800Controller (write, query, close and timeout) without going through the
+    VISA layer, plus streaming reads of binary blocks. Messages are
+    newline-terminated. Errors are raised as OSError, timeouts as TimeoutError,
+    and replies that are not ASCII text as UnicodeDecodeError.
+    """
+
+    def __init__(self, ip_address, port, timeout_ms):
+        """Connect to the device.
+
+        Args:
+            ip_address (str): IP address of the device
+            port (int): Port number for SCPI communication
+            timeout_ms (int): Timeout for connecting and for each socket operation
+        """
+        self.sock = socket.create_connection((ip_address, port), timeout=timeout_ms / 1000)
+
+        # Send each command immediately instead of letting Nagle's algorithm hold
+        # small writes back while waiting for an ACK
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Detect a dead connection, e.g. in a long-running daemon, after minutes of
+        # idling rather than the system default of hours (tuning is platform-specific)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 60), ('TCP_KEEPCNT', 5)):
+            if hasattr(socket, option):
+                self.sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        self.buffer = bytearray()
+
+        # Receive buffer reused by every read, so large transfers allocate nothing per chunk
+        self.chunk = memoryview(bytearray(65536))
+
+    @property
+    def timeout(self):
+        """int: Timeout for each socket operation in milliseconds."""
+        return self.sock.gettimeout() * 1000
+
+    @timeout.setter
+    def timeout(self, timeout_ms):
+        self.sock.settimeout(timeout_ms / 1000)
+
+    def write(self, message):
+        """Send a message, appending the newline terminator.
+
+        Anything still buffered is the rest of an earlier reply abandoned after a
+        timeout, and is dropped so it isn't read as the reply to this message.
+        """
+        self.buffer.clear()
+        self.sock.sendall(message.encode('ascii') + b'\n')
+
+    def read(self):
+        """Read one response line, without the newline terminator."""
+        line = self._read_until(b'\n')
+        return line[:-1].decode('ascii')
+
+    def query(self, message):
+        """Send a message and read the response line."""
+        self.write(message)
+        return self.read()
+
+    def read_block_header(self):
+        """Read the header of an IEEE 488.2 definite length binary block.
+
+        Returns:
+            int: Length of the payload that follows the header
+
+        Raises:
+            ValueError: If the response is not a binary block
+        """
+        while not self.buffer:
+            self._receive()
+        if self.buffer[:1] != b'#':
+            self._read_until(b'\n')  # Drop the unexpected response line
+            raise ValueError("response is not a binary block")
+
+        # Header: '#', the number of length digits, then the payload length
+        header = self._read_exact(2)
+        return int(self._read_exact(int(header[1:2])))
+
+    def iter_block_data(self, length):
+        """Read the payload of a binary block in chunks.
+
+        The length from the block header is used to read exactly the advertised
+        number of bytes, so payload bytes that happen to equal the terminator are
+        kept, and the payload never has to be held in memory as a whole.
+
+        Args:
+            length (int): Payload length returned by read_block_header()
+
+        Yields:
+            memoryview: Consecutive parts of the payload, valid until the next one
+        """
+        # Bytes received along with the header come first
+        if self.buffer:
+            data = bytes(self.buffer[:length])
+            del self.buffer[:length]
+            length -= len(data)
+            yield memoryview(data)
+
+        while length:
+            received = self._receive_chunk(min(length, len(self.chunk)))
+            length -= received
+            yield self.chunk[:received]
+
+        self._read_until(b'\n')  # Discard the terminator after the block
+
+    def close(self):
+        """Close the connection."""
+        self.sock.close()
+
+    def _read_exact(self, count):
+        """Read exactly count bytes."""
+        while len(self.buffer) < count:
+            self._receive()
+        data = bytes(self.buffer[:count])
+        del self.buffer[:count]
+        return data
+
+    def _read_until(self, terminator):
+        """Read up to and including the terminator."""
+        while (end := self.buffer.find(terminator)) < 0:
+            self._receive()
+        return self._read_exact(end + len(terminator))
+
+    def _receive(self):
+        """Append the next chunk received from the device to the buffer."""
+        self.buffer += self.chunk[:self._receive_chunk(len(self.chunk))]
+
+    def _receive_chunk(self, count):
+        """Receive up to count bytes into the reusable chunk buffer.
+
+        Returns:
+            int: Number of bytes received
+        """
+        received = self.sock.recv_into(self.chunk, count)
+        if not received:
+            raise ConnectionError("Connection closed by device")
+        return received
+
+
+class _VisaTransport:
+    """SCPI client using a pyvisa resource, for an explicitly given VISA resource.
+
+    Offers the same interface as _SocketTransport, except for binary block
+    streaming, which read_raw() replaces. VISA I/O errors are raised as OSError
+    and timeouts as TimeoutError, so callers handle both transports alike.
+    """
+
+    def __init__(self, resource_name, timeout_ms):
+        """Open and configure the resource.
+
+        Args:
+            resource_name (str): VISA resource name, e.g. 'TCPIP::192.168.0.55::INSTR'
+            timeout_ms (int): Timeout for opening and for each I/O operation
+        """
+        import pyvisa  # pylint: disable=import-outside-toplevel
+
+        # Looked up once, so I/O calls don't go through the import machinery
+        self.visa_error = pyvisa.errors.VisaIOError
+        self.timeout_code = pyvisa.constants.StatusCode.error_timeout
+
+        with self._translated_errors():
+            self.resource = _get_resource_manager().open_resource(
+                resource_name, open_timeout=timeout_ms
+            )
+            self.resource.timeout = timeout_ms
+            self.resource.read_termination = '\n'
+            self.resource.write_termination = '\n'
+            if isinstance(self.resource, pyvisa.resources.TCPIPSocket):
+                # Same keepalive as the direct transport; pyvisa-py doesn't
+                # support setting VI_ATTR_TCPIP_NODELAY
+                self.resource.set_visa_attribute(
+                    pyvisa.constants.ResourceAttribute.tcpip_keepalive, True
+                )
+
+    @property
+    def timeout(self):
+        """int: Timeout for each I/O operation in milliseconds."""
+        return self.resource.timeout
+
+    @timeout.setter
+    def timeout(self, timeout_ms):
+        self.resource.timeout = timeout_ms
+
+    def write(self, message):
+        """Send a message."""
+        with self._translated_errors():
+            self.resource.write(message)
+
+    def read(self):
+        """Read one response line, without the termination."""
+        with self._translated_errors():
+            return self.resource.read()
+
+    def query(self, message):
+        """Send a message and read the response line."""
+        with self._translated_errors():
+            return self.resource.query(message)
+
+    def read_raw(self):
+        """Read a raw response, such as a binary block."""
+        with self._translated_errors():
+            return self.resource.read_raw()
+
+    def close(self):
+        """Close the resource."""
+        with self._translated_errors():
+            self.resource.close()
+
+    @contextlib.contextmanager
+    def _translated_errors(self):
+        """Raise VISA I/O errors from the block as OSError, and timeouts as TimeoutError."""
+        try:
+            yield
+        except self.visa_error as error_msg:
+            if error_msg.error_code == self.timeout_code:
+                raise TimeoutError(str(error_msg)) from error_msg
+            raise OSError(str(error_msg)) from error_msg
+
+
+@contextlib.contextmanager
+def _replacing_file(filename):
+    """Open a binary file that only replaces filename once it is completely written.
+
+    Data goes to a temporary file in the same directory, renamed over filename when
+    the block completes and deleted if it raises, so an existing file is kept intact.
+
+    Args:
+        filename (str): Output filename
+
+    Yields:
+        file: The temporary file, opened for binary writing
+    """
+    directory, name = os.path.split(filename)
+    temp_filename = os.path.join(directory, f'.{name}.{os.getpid()}.tmp')
+    try:
+        with open(temp_filename, 'wb') as file:
+            yield file
+        os.replace(temp_filename, filename)
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_filename)  # Only still there if writing failed
+
+
+def _join_channel_queries(templates):
+    """Join {channel} query templates into a compound query for each channel number."""
+    return {
+        channel: ';'.join(template.format(channel=channel) for template in templates)
+        for channel in range(1, 4)
+    }
 
 
 class DP800Error(Exception):
     """Custom exception for DP800 operations."""
 
 
+class _Disconnected:
+    """Stand-in for the instrument while the controller is not connected.
+
+    Calling any transport I/O method raises DP800Error, so controller methods
+    need no separate connection check; other attributes raise AttributeError as
+    usual. It is falsy, unlike a connected instrument. Setting the timeout is
+    accepted, so it can be restored unconditionally.
+    """
+
+    timeout = None
+
+    _IO_METHODS = frozenset({
+        'write', 'query', 'read', 'read_raw', 'read_block_header', 'iter_block_data', 'close',
+    })
+
+    def __getattr__(self, name):
+        if name in self._IO_METHODS:
+            raise DP800Error("Device not connected. Call connect() first.")
+        raise AttributeError(name)
+
+    def __bool__(self):
+        return False
+
+
 class DP800Controller:
     """Controller class for Rigol DP832A power supply SCPI operations."""
 
@@ -21,25 +365,53 @@ class DP800Controller:
     VALID_DEVICE_MODELS = {'DP832A'}
     VALID_MANUFACTURER = 'RIGOL TECHNOLOGIES'
 
-    # DP832A channel specifications from Table 2-1
+    # Accepted (manufacturer, model) pairs, checked with a single lookup
+    _VALID_PREFIXES = frozenset(itertools.product((VALID_MANUFACTURER,), VALID_DEVICE_MODELS))
+
+    # DP832A channel specifications from Table 2-1, as
+    # (voltage_min, voltage_max, current_min, current_max)
     CHANNEL_SPECS = {
-        1: {'voltage_min': 0.0, 'voltage_max': 32.0, 'current_min': 0.0, 'current_max': 3.2},
-        2: {'voltage_min': 0.0, 'voltage_max': 32.0, 'current_min': 0.0, 'current_max': 3.2},
-        3: {'voltage_min': 0.0, 'voltage_max': 5.3, 'current_min': 0.0, 'current_max': 3.2}
+        1: (0.0, 32.0, 0.0, 3.2),
+        2: (0.0, 32.0, 0.0, 3.2),
+        3: (0.0, 5.3, 0.0, 3.2)
     }
 
-    def __init__(self, ip_address='192.168.0.55', port=5555):
+    # Queries making up a channel state, in the order they are answered
+    CHANNEL_STATE_QUERIES = (
+        ':SOUR{channel}:VOLT?',
+        ':SOUR{channel}:CURR?',
+        ':SOUR{channel}:VOLT:PROT?',
+        ':SOUR{channel}:CURR:PROT?',
+        ':SOUR{channel}:VOLT:PROT:STAT?',
+        ':SOUR{channel}:CURR:PROT:STAT?',
+        ':OUTP? CH{channel}',
+    )
+    _STATE_QUERIES = _join_channel_queries(CHANNEL_STATE_QUERIES)
+    _ALL_STATE_QUERY = ';'.join(_STATE_QUERIES.values())
+
+    # I/O timeouts in milliseconds. The default is short so an unreachable device
+    # fails fast; rendering a screenshot takes the device several seconds.
+    DEFAULT_TIMEOUT_MS = 1000
+    SCREENSHOT_TIMEOUT_MS = 10000
+
+    def __init__(self, ip_address='192.168.0.55', port=5555, resource_name=None,
+                 timeout_ms=DEFAULT_TIMEOUT_MS):
         """Initialize the controller with device connection parameters.
 
         Args:
             ip_address (str): IP address of the device
             port (int): Port number for SCPI communication
+            resource_name (str, optional): VISA resource name to open through pyvisa,
+                e.g. 'TCPIP::192.168.0.55::INSTR'. By default the raw socket at
+                ip_address:port is used directly, without the VISA layer.
+            timeout_ms (int): Timeout for connecting and for each I/O operation
         """
         self.ip_address = ip_address
         self.port = port
-        self.resource_manager = None
-        self.instrument = None
-        self.resource_name = f'TCPIP::{ip_address}::{port}::SOCKET'
+        self.timeout_ms = timeout_ms
+        self.instrument = _Disconnected()
+        self.use_visa = resource_name is not None
+        self.resource_name = resource_name or f'TCPIP::{ip_address}::{port}::SOCKET'
 
     def connect(self):
         """Connect to the device and configure communication parameters.
@@ -48,32 +420,31 @@ class DP800Controller:
             DP800Error: If connection fails
         """
         try:
-            self.resource_manager = pyvisa.ResourceManager('@py')
-            self.instrument = self.resource_manager.open_resource(self.resource_name)
-            self.instrument.read_termination = '\n'
-            self.instrument.write_termination = '\n'
-        except pyvisa.errors.VisaIOError as error_msg:
+            if self.use_visa:
+                self.instrument = _VisaTransport(self.resource_name, self.timeout_ms)
+            else:
+                self.instrument = _SocketTransport(self.ip_address, self.port, self.timeout_ms)
+        except _IO_ERRORS as error_msg:
             raise DP800Error(
                 f"Failed to connect to device at {self.resource_name}: {error_msg}"
             ) from error_msg
 
     def disconnect(self):
-        """Disconnect from the device and clean up resources."""
-        if self.instrument:
-            try:
-                self.instrument.close()
-            except (pyvisa.errors.VisaIOError, AttributeError):
-                pass  # Ignore errors during cleanup
-            finally:
-                self.instrument = None
+        """Disconnect from the device and clean up resources.
 
-        if self.resource_manager:
-            try:
-                self.resource_manager.close()
-            except (pyvisa.errors.VisaIOError, AttributeError):
-                pass  # Ignore errors during cleanup
-            finally:
-                self.resource_manager = None
+        Does nothing if the controller is not connected.
+        """
+        # Only a connected instrument is truthy, so it doubles as the connection flag
+        if not self.instrument:
+            return
+
+        # A pyvisa resource manager is shared with other controllers, so it stays open
+        instrument = self.instrument
+        self.instrument = _Disconnected()
+        try:
+            instrument.close()
+        except _IO_ERRORS + (AttributeError,):
+            pass  # Ignore errors during cleanup
 
     def get_device_id(self):
         """Query device identification using *IDN? SCPI command.
@@ -84,13 +455,16 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or query fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
         try:
-            device_id = self.instrument.query('*IDN?').strip()
-            return device_id
-        except pyvisa.errors.VisaIOError as error_msg:
+            try:
+                device_id = self.instrument.query('*IDN?')
+            except TimeoutError:
+                # The timeout is short, so give a slow device one more chance to
+                # answer. Only read again: resending would leave a second reply
+                # behind for the next command to read.
+                device_id = self.instrument.read()
+            return device_id.strip()
+        except _IO_ERRORS as error_msg:
             raise DP800Error(
                 f"Failed to query device identification: {error_msg}"
             ) from error_msg
@@ -109,13 +483,17 @@ class DP800Controller:
 
         # Parse IDN response: "RIGOL TECHNOLOGIES,DP832A,DP8B264501878,00.01.19"
         # Only validate manufacturer and model (first 2 parts), ignore serial and firmware
-        parts = device_id.split(',')
+        parts = device_id.split(',', 2)
         if len(parts) < 2:
             raise DP800Error(f"Invalid device identification format: {device_id}")
 
         manufacturer = parts[0].strip()
         model = parts[1].strip()
 
+        if (manufacturer, model) in self._VALID_PREFIXES:
+            return
+
+        # Report which part does not match
         if manufacturer != self.VALID_MANUFACTURER:
             raise DP800Error(
                 f"Unsupported manufacturer '{manufacturer}'. "
@@ -140,36 +518,16 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or query fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
-        if not 1 <= channel <= 3:
-            raise DP800Error(f"Invalid channel {channel}. Must be 1-3 for DP832A.")
+        self._channel_commands(channel)  # Validates the channel number
 
         try:
-            # Query all channel state parameters
-            set_voltage = float(self.instrument.query(f':SOUR{channel}:VOLT?').strip())
-            set_current = float(self.instrument.query(f':SOUR{channel}:CURR?').strip())
-            ovp_value = float(self.instrument.query(f':SOUR{channel}:VOLT:PROT?').strip())
-            ocp_value = float(self.instrument.query(f':SOUR{channel}:CURR:PROT?').strip())
-            ovp_status = self.instrument.query(f':SOUR{channel}:VOLT:PROT:STAT?').strip()
-            ocp_status = self.instrument.query(f':SOUR{channel}:CURR:PROT:STAT?').strip()
-            ovp_enabled = ovp_status.upper() == 'ON'
-            ocp_enabled = ocp_status.upper() == 'ON'
-            output_enabled = self.get_output_state(channel)
-
-            return {
-                'channel': channel,
-                'set_voltage': set_voltage,
-                'set_current': set_current,
-                'ovp_value': ovp_value,
-                'ocp_value': ocp_value,
-                'ovp_enabled': ovp_enabled,
-                'ocp_enabled': ocp_enabled,
-                'output_enabled': output_enabled
-            }
-
-        except (pyvisa.errors.VisaIOError, ValueError) as error_msg:
+            # Query all channel state parameters in a single round trip
+            fields = self._query_fields(
+                self._STATE_QUERIES[channel], len(self.CHANNEL_STATE_QUERIES)
+            )
+            return self._parse_channel_state(channel, fields)
+
+        except _IO_ERRORS + (ValueError,) as error_msg:
             raise DP800Error(
                 f"Failed to query channel {channel} state: {error_msg}"
             ) from error_msg
@@ -183,7 +541,80 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or query fails
         """
-        return [self.get_channel_state(channel) for channel in range(1, 4)]
+        count = len(self.CHANNEL_STATE_QUERIES)
+
+        try:
+            # Query every channel's state parameters in a single round trip
+            fields = self._query_fields(self._ALL_STATE_QUERY, count * len(self._STATE_QUERIES))
+            return [
+                self._parse_channel_state(channel, fields[index * count:(index + 1) * count])
+                for index, channel in enumerate(self._STATE_QUERIES)
+            ]
+
+        except _IO_ERRORS + (ValueError,) as error_msg:
+            raise DP800Error(f"Failed to query channel states: {error_msg}") from error_msg
+
+    @staticmethod
+    def _channel_commands(channel):
+        """Look up the fixed SCPI commands of a channel, validating its number.
+
+        Args:
+            channel (int): Channel number (1-3 for DP832A)
+
+        Returns:
+            dict: The channel's entry in _CHANNEL_COMMANDS
+
+        Raises:
+            DP800Error: If the channel number is invalid
+        """
+        try:
+            return _CHANNEL_COMMANDS[channel]
+        except (KeyError, TypeError):
+            raise DP800Error(f"Invalid channel {channel}. Must be 1-3 for DP832A.") from None
+
+    def _query_fields(self, query, count):
+        """Send a compound query and split its response into fields.
+
+        Args:
+            query (str): Semicolon-separated SCPI queries
+            count (int): Number of fields the response must contain
+
+        Returns:
+            list: Response fields, in query order
+
+        Raises:
+            ValueError: If the response has the wrong number of fields
+        """
+        fields = self.instrument.query(query).split(';')
+        if len(fields) != count:
+            raise ValueError(f"expected {count} response fields, got {len(fields)}")
+        return fields
+
+    def _parse_channel_state(self, channel, fields):
+        """Convert the response fields of a channel state query into a dict.
+
+        Args:
+            channel (int): Channel number (1-3 for DP832A)
+            fields (list): Response fields in CHANNEL_STATE_QUERIES order
+
+        Returns:
+            dict: Channel state with voltage, current, OVP, OCP settings and status
+
+        Raises:
+            ValueError: If a numeric field cannot be parsed
+        """
+        (set_voltage, set_current, ovp_value, ocp_value,
+         ovp_status, ocp_status, output_status) = fields
+        return {
+            'channel': channel,
+            'set_voltage': float(set_voltage),
+            'set_current': float(set_current),
+            'ovp_value': float(ovp_value),
+            'ocp_value': float(ocp_value),
+            'ovp_enabled': _is_on(ovp_status),
+            'ocp_enabled': _is_on(ocp_status),
+            'output_enabled': _is_on(output_status)
+        }
 
     def take_screenshot(self, filename=None):
         """Take a screenshot of the device display and save as BMP file.
@@ -197,40 +628,81 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or screenshot fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
         if filename is None:
             timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
             filename = f"screenshot_{self.ip_address}_{timestamp}.bmp"
 
         try:
-            # Send screenshot command and get binary response
-            self.instrument.write(':SYSTem:PRINT? BMP')
+            # Rendering the screenshot takes longer than ordinary queries
+            self.instrument.timeout = max(self.timeout_ms, self.SCREENSHOT_TIMEOUT_MS)
 
-            # Read raw binary data
-            raw_data = self.instrument.read_raw()
+            if isinstance(self.instrument, _SocketTransport):
+                self._stream_screenshot(filename)
+            else:
+                # Send screenshot command and get binary response
+                self.instrument.write(':SYSTem:PRINT? BMP')
+                self._save_raw_screenshot(filename)
 
-            # Parse TMC header to find actual image data
-            # TMC format: '#' + length_of_length + length + data
-            if raw_data[0:1] != b'#':
-                raise DP800Error("Invalid TMC header in screenshot data")
+            return filename
 
-            # Get the length of the length field
-            length_of_header = int(chr(raw_data[1]))
+        except _IO_ERRORS + (ValueError,) as error_msg:
+            raise DP800Error(f"Failed to take screenshot: {error_msg}") from error_msg
+        finally:
+            self.instrument.timeout = self.timeout_ms
 
-            # Skip TMC header to get to actual BMP data
-            header_size = 2 + length_of_header
-            bmp_data = raw_data[header_size:]
+    def _stream_screenshot(self, filename):
+        """Copy a screenshot from the socket transport to a file in chunks.
 
-            # Write BMP data to file
-            with open(filename, 'wb') as file:
-                file.write(bmp_data)
+        Nothing is written before the device answers with a binary block, and filename
+        is only replaced once the whole image has arrived. The image is always read
+        off the connection in full, so later replies stay in step with their commands.
 
-            return filename
+        Args:
+            filename (str): Output filename
 
-        except (pyvisa.errors.VisaIOError, IOError, ValueError) as error_msg:
-            raise DP800Error(f"Failed to take screenshot: {error_msg}") from error_msg
+        Raises:
+            OSError: If the file or the device connection fails
+            ValueError: If the response is not a binary block
+        """
+        self.instrument.write(':SYSTem:PRINT? BMP')
+        chunks = self.instrument.iter_block_data(self.instrument.read_block_header())
+        try:
+            with _replacing_file(filename) as file:
+                for chunk in chunks:
+                    file.write(chunk)
+        finally:
+            for _ in chunks:
+                pass  # Drain the rest of the image if writing failed
+
+    def _save_raw_screenshot(self, filename):
+        """Read a screenshot through pyvisa and save the BMP data.
+
+        Args:
+            filename (str): Output filename
+
+        Raises:
+            DP800Error: If the response is not a binary block
+        """
+        # Read raw binary data
+        raw_data = self.instrument.read_raw()
+
+        # Parse TMC header to find actual image data
+        # TMC format: '#' + length_of_length + length + data
+        if raw_data[0:1] != b'#':
+            raise DP800Error("Invalid TMC header in screenshot data")
+
+        # Get the length of the length field (a single ASCII digit)
+        length_of_header = raw_data[1] - 0x30 if len(raw_data) > 1 else -1
+        if not 0 <= length_of_header <= 9:
+            raise DP800Error("Invalid TMC header in screenshot data")
+
+        # Skip TMC header to get to actual BMP data without copying it
+        header_size = 2 + length_of_header
+        bmp_data = memoryview(raw_data)[header_size:]
+
+        # Write BMP data to file
+        with _replacing_file(filename) as file:
+            file.write(bmp_data)
 
     def set_output_state(self, channel, state):
         """Turn a channel output on or off.
@@ -242,16 +714,11 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or command fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
-        if not 1 <= channel <= 3:
-            raise DP800Error(f"Invalid channel {channel}. Must be 1-3 for DP832A.")
+        commands = self._channel_commands(channel)
 
         try:
-            state_cmd = "ON" if state else "OFF"
-            self.instrument.write(f':OUTP CH{channel},{state_cmd}')
-        except pyvisa.errors.VisaIOError as error_msg:
+            self.instrument.write(commands['outp on' if state else 'outp off'])
+        except _IO_ERRORS as error_msg:
             action = "enable" if state else "disable"
             raise DP800Error(
                 f"Failed to {action} channel {channel} output: {error_msg}"
@@ -266,8 +733,39 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or command fails
         """
-        for channel in range(1, 4):
-            self.set_output_state(channel, state)
+        try:
+            # Switch every channel with a single compound write
+            self.instrument.write(_ALL_OUTPUTS_COMMAND[bool(state)])
+        except _IO_ERRORS as error_msg:
+            action = "enable" if state else "disable"
+            raise DP800Error(
+                f"Failed to {action} channel outputs: {error_msg}"
+            ) from error_msg
+
+    def set_output_states(self, states):
+        """Turn several channel outputs on or off at once.
+
+        Args:
+            states (dict): Maps channel numbers (1-3 for DP832A) to True to turn
+                the output on or False to turn it off
+
+        Raises:
+            DP800Error: If device is not connected, a channel is invalid or command fails
+        """
+        command = ';'.join(
+            self._channel_commands(channel)['outp on' if state else 'outp off']
+            for channel, state in states.items()
+        )
+        if not command:
+            return
+
+        try:
+            # Switch all requested channels with a single compound write
+            self.instrument.write(command)
+        except _IO_ERRORS as error_msg:
+            raise DP800Error(
+                f"Failed to switch channel outputs: {error_msg}"
+            ) from error_msg
 
     def get_output_state(self, channel):
         """Get the output state for a specific channel.
@@ -281,16 +779,11 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or query fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
-        if not 1 <= channel <= 3:
-            raise DP800Error(f"Invalid channel {channel}. Must be 1-3 for DP832A.")
+        commands = self._channel_commands(channel)
 
         try:
-            response = self.instrument.query(f':OUTP? CH{channel}').strip()
-            return response.upper() == 'ON'
-        except pyvisa.errors.VisaIOError as error_msg:
+            return _is_on(self.instrument.query(commands['outp?']))
+        except _IO_ERRORS + (ValueError,) as error_msg:
             raise DP800Error(
                 f"Failed to query channel {channel} output state: {error_msg}"
             ) from error_msg
@@ -306,35 +799,39 @@ class DP800Controller:
         Raises:
             DP800Error: If parameters are out of range
         """
-        specs = self.CHANNEL_SPECS[channel]
+        voltage_min, voltage_max, current_min, current_max = self.CHANNEL_SPECS[channel]
 
         if voltage is not None:
-            if not specs['voltage_min'] <= voltage <= specs['voltage_max']:
+            if not voltage_min <= voltage <= voltage_max:
                 raise DP800Error(
                     f"Voltage {voltage}V out of range for channel {channel}. "
-                    f"Valid range: {specs['voltage_min']}V to {specs['voltage_max']}V"
+                    f"Valid range: {voltage_min}V to {voltage_max}V"
                 )
 
         if current is not None:
-            if not specs['current_min'] <= current <= specs['current_max']:
+            if not current_min <= current <= current_max:
                 raise DP800Error(
                     f"Current {current}A out of range for channel {channel}. "
-                    f"Valid range: {specs['current_min']}A to {specs['current_max']}A"
+                    f"Valid range: {current_min}A to {current_max}A"
                 )
 
-    def _verify_channel_settings(self, channel, voltage, current):
+    @staticmethod
+    def _verify_channel_settings(voltage, current, readback):
         """Verify that channel settings were applied correctly.
 
         Args:
-            channel (int): Channel number (1-3 for DP832A)
             voltage (float, optional): Expected voltage value
             current (float, optional): Expected current value
+            readback (list): Voltage and/or current read back from the device, in
+                that order, for the expected values that are not None
 
         Raises:
             DP800Error: If verification fails
         """
+        readback = iter(readback)
+
         if voltage is not None:
-            actual_voltage = float(self.instrument.query(f':SOUR{channel}:VOLT?').strip())
+            actual_voltage = next(readback)
             if abs(actual_voltage - voltage) > 0.001:  # Allow small floating point differences
                 raise DP800Error(
                     f"Verification failed: Set voltage {voltage}V "
@@ -342,13 +839,21 @@ class DP800Controller:
                 )
 
         if current is not None:
-            actual_current = float(self.instrument.query(f':SOUR{channel}:CURR?').strip())
+            actual_current = next(readback)
             if abs(actual_current - current) > 0.0001:  # Allow small floating point differences
                 raise DP800Error(
                     f"Verification failed: Set current {current}A "
                     f"but device reports {actual_current}A"
                 )
 
+    def _wait_until_complete(self):
+        """Block until the device has executed all previously sent commands.
+
+        Uses *OPC?, which the device answers with 1 once its command queue is
+        done, instead of sleeping for a fixed time.
+        """
+        self.instrument.query('*OPC?')
+
     def set_channel_parameters(self, channel, voltage=None, current=None):
         """Set channel voltage and/or current using :SOURce commands.
 
@@ -360,35 +865,78 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or command fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
-        if not 1 <= channel <= 3:
-            raise DP800Error(f"Invalid channel {channel}. Must be 1-3 for DP832A.")
+        try:
+            self._apply_channel_parameters([(channel, voltage, current)])
+        except _IO_ERRORS + (ValueError,) as error_msg:
+            raise DP800Error(
+                f"Failed to set channel {channel} parameters: {error_msg}"
+            ) from error_msg
 
-        if voltage is None and current is None:
-            raise DP800Error("Must specify at least one of voltage or current")
+    def set_channel_parameters_batch(self, settings):
+        """Set voltage and/or current of several channels in a single transaction.
 
-        # Validate parameters against channel specifications
-        self._validate_channel_parameters(channel, voltage, current)
+        Args:
+            settings (iterable): (channel, voltage, current) tuples, where voltage or
+                current may be None to leave it unchanged. Each channel may
+                appear only once.
 
+        Raises:
+            DP800Error: If device is not connected, a setting is invalid or command fails
+        """
         try:
+            self._apply_channel_parameters(settings)
+        except _IO_ERRORS + (ValueError,) as error_msg:
+            raise DP800Error(f"Failed to set channel parameters: {error_msg}") from error_msg
+
+    def _apply_channel_parameters(self, settings):
+        """Validate, set and verify channel parameters with one compound query.
+
+        Args:
+            settings (iterable): (channel, voltage, current) tuples
+
+        Raises:
+            DP800Error: If a setting is invalid or verification fails
+            OSError, ValueError: If the query fails
+        """
+        settings = list(settings)  # Iterated again for verification
+        writes = []
+        queries = []
+        channels = set()
+        for channel, voltage, current in settings:
+            commands = self._channel_commands(channel)
+
+            if voltage is None and current is None:
+                raise DP800Error("Must specify at least one of voltage or current")
+
+            # Readback only sees the last value written to a channel
+            if channel in channels:
+                raise DP800Error(f"Channel {channel} is set more than once")
+            channels.add(channel)
+
+            # Validate parameters against channel specifications
+            self._validate_channel_parameters(channel, voltage, current)
+
             if voltage is not None:
-                self.instrument.write(f':SOUR{channel}:VOLT {voltage}')
+                writes.append(f':SOUR{channel}:VOLT {voltage}')
+                queries.append(commands['volt?'])
 
             if current is not None:
-                self.instrument.write(f':SOUR{channel}:CURR {current}')
+                writes.append(f':SOUR{channel}:CURR {current}')
+                queries.append(commands['curr?'])
 
-            # Allow time for device to process the settings
-            time.sleep(0.5)  # 500 milliseconds
+        if not writes:
+            return
 
-            # Verify the settings were applied correctly
-            self._verify_channel_settings(channel, voltage, current)
+        # Set, wait for completion (*OPC?) and read back in a single round trip
+        fields = self._query_fields(';'.join(writes + ['*OPC?'] + queries), 1 + len(queries))
+        if fields[0].strip() != '1':
+            raise ValueError(f"unexpected *OPC? response {fields[0]!r}")
 
-        except pyvisa.errors.VisaIOError as error_msg:
-            raise DP800Error(
-                f"Failed to set channel {channel} parameters: {error_msg}"
-            ) from error_msg
+        # Verify the settings were applied correctly
+        readback = iter(float(field) for field in fields[1:])
+        for channel, voltage, current in settings:
+            values = [next(readback) for value in (voltage, current) if value is not None]
+            self._verify_channel_settings(voltage, current, values)
 
     def get_channel_parameters(self, channel):
         """Get current channel parameters using :APPL? command.
@@ -402,16 +950,12 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or query fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
-        if not 1 <= channel <= 3:
-            raise DP800Error(f"Invalid channel {channel}. Must be 1-3 for DP832A.")
+        commands = self._channel_commands(channel)
 
         try:
-            response = self.instrument.query(f':APPL? CH{channel}').strip()
+            response = self.instrument.query(commands['appl?']).strip()
             return response
-        except pyvisa.errors.VisaIOError as error_msg:
+        except _IO_ERRORS as error_msg:
             raise DP800Error(
                 f"Failed to query channel {channel} parameters: {error_msg}"
             ) from error_msg
@@ -425,9 +969,6 @@ class DP800Controller:
         Raises:
             DP800Error: If device is not connected or command fails
         """
-        if not self.instrument:
-            raise DP800Error("Device not connected. Call connect() first.")
-
         if not 0 <= preset_value <= 4:
             raise DP800Error(f"Invalid preset value {preset_value}. Must be 0-4.")
 
@@ -446,13 +987,13 @@ class DP800Controller:
             # Step 1: Set the preset key
             self.instrument.write(f':PRES:KEY {preset_name}')
 
-            # Step 2: Allow time for command processing
-            time.sleep(0.1)  # 100 milliseconds
+            # Step 2: Wait for the key to be processed
+            self._wait_until_complete()
 
             # Step 3: Apply the preset
             self.instrument.write(':PRES')
 
-        except pyvisa.errors.VisaIOError as error_msg:
+        except _IO_ERRORS as error_msg:
             raise DP800Error(
                 f"Failed to apply preset {preset_value} ({preset_name}): {error_msg}"
             ) from error_msg
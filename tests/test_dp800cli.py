@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Steve deRosier
+
+"""Tests for the dp800cli command-line tool."""
+
+import configparser
+import unittest
+from pathlib import Path
+
+from dp800cli import parse_config_file
+
+EXAMPLE_CONFIG = Path(__file__).resolve().parent.parent / 'example' / 'dp800config'
+
+
+def _configparser_sections(text):
+    """Parse text with configparser, as parse_config_file() should.
+
+    Args:
+        text (str): Contents of a configuration file
+
+    Returns:
+        dict: Options of each section, keyed by section name
+    """
+    parser = configparser.ConfigParser()
+    parser.read_string(text)
+    return {name: dict(parser[name]) for name in parser.sections()}
+
+
+class ParseConfigFileTest(unittest.TestCase):
+    """Tests for parse_config_file()."""
+
+    def assert_parses_like_configparser(self, text):
+        """Check that text parses to the same options as with configparser."""
+        self.assertEqual(
+            parse_config_file(text.splitlines(keepends=True)),
+            _configparser_sections(text),
+        )
+
+    def test_example_config(self):
+        """The shipped example file parses, and as configparser reads it."""
+        text = EXAMPLE_CONFIG.read_text(encoding='utf-8')
+        sections = parse_config_file(text.splitlines(keepends=True))
+
+        self.assertEqual(sections['device'], {
+            'ip': '192.168.0.55',
+            'port': '5555',
+            'validate': 'true',
+        })
+        self.assertEqual(sections['display'], {'color': 'true'})
+        self.assertEqual(sections['tools'], {})
+        self.assert_parses_like_configparser(text)
+
+    def test_continuation_lines(self):
+        """More deeply indented lines continue the previous value."""
+        self.assert_parses_like_configparser(
+            '[tools]\n'
+            'screenshotviewer = viewer\n'
+            '    --fullscreen\n'
+            '  # comment inside the value\n'
+            '    {filename}\n'
+            'screenshotdebug = true\n'
+        )
+
+    def test_default_section(self):
+        """[DEFAULT] options fill in options the other sections don't set."""
+        self.assert_parses_like_configparser(
+            '[DEFAULT]\n'
+            'color = false\n'
+            'port = 5025\n'
+            '[device]\n'
+            'port = 5555\n'
+            '[display]\n'
+        )
+
+    def test_duplicates_rejected(self):
+        """Repeated sections and options are errors, as in strict configparser."""
+        for text in ('[device]\n[display]\n[device]\n', '[device]\nip = a\nIP = b\n'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_config_file(text.splitlines(keepends=True))
+
+    def test_option_outside_section_rejected(self):
+        """Options before the first section header are errors."""
+        with self.assertRaises(ValueError):
+            parse_config_file(['ip = 192.168.0.55\n'])
+
+
+if __name__ == '__main__':
+    unittest.main()
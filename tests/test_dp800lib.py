@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Steve deRosier
+
+"""Tests for the dp800lib controller library."""
+
+import os
+import socketserver
+import tempfile
+import threading
+import unittest
+
+from dp800lib import DP800Controller, DP800Error
+
+IMAGE = b'BM' + bytes(range(256)) * 8
+
+
+class _FakeDeviceHandler(socketserver.StreamRequestHandler):
+    """Answer screenshot requests with the server's canned reply."""
+
+    def handle(self):
+        """Reply to each screenshot command; other commands get no reply."""
+        for line in self.rfile:
+            if line.startswith(b':SYSTem:PRINT?'):
+                self.wfile.write(self.server.reply)
+                if self.server.close_after_reply:
+                    return
+
+
+class _FakeDevice(socketserver.ThreadingTCPServer):
+    """Local TCP server standing in for the device's SCPI socket."""
+
+    daemon_threads = True
+
+    def __init__(self, reply, close_after_reply=False):
+        """Listen on a free local port.
+
+        Args:
+            reply (bytes): Response sent for each screenshot command
+            close_after_reply (bool): Whether to drop the connection after replying
+        """
+        super().__init__(('127.0.0.1', 0), _FakeDeviceHandler)
+        self.reply = reply
+        self.close_after_reply = close_after_reply
+
+
+class TakeScreenshotTest(unittest.TestCase):
+    """Tests for DP800Controller.take_screenshot()."""
+
+    def setUp(self):
+        """Create a directory holding an existing screenshot file."""
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.filename = os.path.join(self.directory, 'screenshot.bmp')
+        with open(self.filename, 'wb') as file:
+            file.write(b'existing image')
+
+    def take_screenshot(self, reply, close_after_reply=False):
+        """Take a screenshot from a fake device sending reply."""
+        device = _FakeDevice(reply, close_after_reply)
+        self.addCleanup(device.server_close)
+        threading.Thread(target=device.serve_forever, daemon=True).start()
+        self.addCleanup(device.shutdown)
+
+        controller = DP800Controller('127.0.0.1', device.server_address[1])
+        controller.connect()
+        self.addCleanup(controller.disconnect)
+        return controller.take_screenshot(self.filename)
+
+    def assert_existing_file_untouched(self):
+        """Check that the existing file is unchanged and no temporary file is left."""
+        with open(self.filename, 'rb') as file:
+            self.assertEqual(file.read(), b'existing image')
+        self.assertEqual(os.listdir(self.directory), ['screenshot.bmp'])
+
+    def test_saves_image(self):
+        """A complete binary block replaces the existing file."""
+        header = f'#9{len(IMAGE):09d}'.encode()
+        self.assertEqual(self.take_screenshot(header + IMAGE + b'\n'), self.filename)
+
+        with open(self.filename, 'rb') as file:
+            self.assertEqual(file.read(), IMAGE)
+        self.assertEqual(os.listdir(self.directory), ['screenshot.bmp'])
+
+    def test_non_block_reply_keeps_existing_file(self):
+        """A reply that is not a binary block leaves the existing file untouched."""
+        with self.assertRaises(DP800Error):
+            self.take_screenshot(b'ERROR\n')
+        self.assert_existing_file_untouched()
+
+    def test_truncated_image_keeps_existing_file(self):
+        """A connection dropped partway through the image leaves the existing file untouched."""
+        header = f'#9{len(IMAGE):09d}'.encode()
+        with self.assertRaises(DP800Error):
+            self.take_screenshot(header + IMAGE[:1000], close_after_reply=True)
+        self.assert_existing_file_untouched()
+
+
+if __name__ == '__main__':
+    unittest.main()